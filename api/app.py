@@ -4,21 +4,41 @@ API inference service for satellite image tiles.
 Key design decisions:
 - Expose inference via a stateless REST API.
 - Load the model artifact once at startup to minimize request latency.
-- Reuse the same inference logic as batch workflows to ensure consistency.
+- Warm up the inference path, including reading a stored tile, before
+  reporting readiness, so the first requests do not pay one-off initialization
+  costs.
+- Keep the inference path warm with periodic background predictions, so the
+  first request after an idle period is as fast as the rest.
+- Cache validated and decoded tiles keyed by path, modification time, and size,
+  so repeated requests for hot tiles skip disk I/O while edits are still seen.
+- Coalesce concurrent requests into micro-batches, reusing the same vectorized
+  inference logic as batch workflows to ensure consistency.
 """
 
+import asyncio
+import os
 from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
+from stat import S_ISREG
 
+import numpy as np
 from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from constants import MODELS_DIRECTORY, TILES_DIRECTORY
+from api.batching import MicroBatcher
+from constants import DEFAULT_TILE_SIZE, MODELS_DIRECTORY, TILES_DIRECTORY
 from core_pipeline.exceptions import PipelineError
-from core_pipeline.observability import MetricsRecorder, Timer
+from core_pipeline.observability import (
+    MetricsRecorder,
+    Timer,
+    elapsed_seconds,
+    start_timer,
+)
 from core_pipeline.validate import validate_raster
-from model.inferences import load_model, predict
-from utils.data import load_tile
+from model.inferences import load_model, predict_batch
+from utils.data import list_tiles, load_tile
 from utils.logging import setup_logger
 from utils.types_ import Model
 
@@ -27,14 +47,68 @@ metrics = MetricsRecorder()
 
 MODEL_PATH = MODELS_DIRECTORY / "latest_model.json"
 ALLOWED_TILE_DIRECTORY = TILES_DIRECTORY
+# Resolved once, with a trailing separator so sibling directories never match.
+_ALLOWED_TILE_PREFIX = os.path.join(os.path.realpath(ALLOWED_TILE_DIRECTORY), "")
+WARMUP_MODEL = os.getenv("WARMUP_MODEL", "1") == "1"
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "32"))
+MAX_LATENCY_MS = float(os.getenv("MAX_LATENCY_MS", "5"))
+TILE_CACHE_SIZE = int(os.getenv("TILE_CACHE_SIZE", "256"))
+# Seconds between background keep-warm predictions; 0 disables them.
+KEEP_WARM_INTERVAL_SECONDS = float(os.getenv("KEEP_WARM_INTERVAL_SECONDS", "60"))
+# Comma-separated tile paths, relative to ALLOWED_TILE_DIRECTORY, to cache at startup.
+PRELOAD_TILE_CACHE = os.getenv("PRELOAD_TILE_CACHE", "")
 
 model: Model | None = None
+batcher: MicroBatcher | None = None
+_warm = False
+
+
+def _warm_up(current_model: Model) -> None:
+    """Run a prediction so one-off initialization happens before serving.
+
+    A stored tile is validated and read like a request would be, so GDAL driver
+    setup on the first raster open is paid here too.
+    """
+    try:
+        with Timer() as timer:
+            predict_batch(_load_warm_up_tiles(), current_model)
+    except Exception as exc:
+        logger.warning("Model warm-up failed | error=%s", exc)
+        return
+
+    logger.info("Model warm-up completed | duration=%.4fs", timer.duration or 0.0)
+
+
+def _load_warm_up_tiles() -> np.ndarray:
+    """Return a batch holding the first stored tile, or zeros if there is none."""
+    try:
+        tile_path = next(iter(list_tiles(ALLOWED_TILE_DIRECTORY)), None)
+    except OSError:
+        tile_path = None
+
+    if tile_path is None:
+        return np.zeros((1, 1, DEFAULT_TILE_SIZE, DEFAULT_TILE_SIZE), dtype=np.uint8)
+
+    validate_raster(tile_path)
+    return load_tile(tile_path)[np.newaxis]
+
+
+async def _keep_warm(current_batcher: MicroBatcher, interval_seconds: float) -> None:
+    """Periodically run a dummy prediction through the batcher until cancelled."""
+    dummy_tile = np.zeros((1, DEFAULT_TILE_SIZE, DEFAULT_TILE_SIZE), dtype=np.uint8)
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await current_batcher.predict(dummy_tile)
+        except Exception as exc:
+            logger.warning("Keep-warm prediction failed | error=%s", exc)
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     """Application lifespan: load and clean up resources."""
-    global model
+    global model, batcher, _warm
 
     try:
         model = load_model(str(MODEL_PATH))
@@ -46,14 +120,35 @@ async def lifespan(_: FastAPI):
     except Exception as exc:
         raise RuntimeError(f"Failed to load model from '{MODEL_PATH}': {exc}") from exc
 
+    if WARMUP_MODEL:
+        _warm_up(model)
+    _preload_tile_cache()
+
+    batcher = MicroBatcher(model, MAX_BATCH_SIZE, MAX_LATENCY_MS)
+    batcher.start()
+    keep_warm_task = None
+    if KEEP_WARM_INTERVAL_SECONDS > 0:
+        keep_warm_task = asyncio.create_task(
+            _keep_warm(batcher, KEEP_WARM_INTERVAL_SECONDS)
+        )
+    _warm = True
+
     yield
 
+    _warm = False
+    if keep_warm_task is not None:
+        keep_warm_task.cancel()
+        await asyncio.gather(keep_warm_task, return_exceptions=True)
+    await batcher.stop()
+    batcher = None
+
 
 app = FastAPI(
     title="Satellite Tile Inference API",
     description="Run ML inference on satellite image tiles.",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -71,69 +166,136 @@ class InferenceResponse(BaseModel):
     model_path: str
 
 
-def _validate_tile_path(user_path: str) -> Path:
+def _validate_tile_path(user_path: str) -> tuple[Path, os.stat_result]:
     """Validate and resolve a user-provided tile path safely.
 
     Prevents path traversal by ensuring the resolved path stays within
-    ALLOWED_TILE_DIRECTORY.
+    ALLOWED_TILE_DIRECTORY. The path is checked with a single ``stat``, whose
+    result is returned alongside it so the tile cache can reuse it.
     """
     try:
-        resolved_path = (ALLOWED_TILE_DIRECTORY / user_path).resolve()
+        resolved_path = os.path.realpath(os.path.join(_ALLOWED_TILE_PREFIX, user_path))
     except (OSError, ValueError) as err:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid tile path.",
         ) from err
 
-    if not resolved_path.is_relative_to(ALLOWED_TILE_DIRECTORY):
+    # The directory itself is in bounds, so it is reported as not found instead.
+    if not os.path.join(resolved_path, "").startswith(_ALLOWED_TILE_PREFIX):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access to this path is not allowed.",
         )
-    if not resolved_path.is_file():
+
+    try:
+        stat = os.stat(resolved_path)
+    except OSError:
+        stat = None
+    if stat is None or not S_ISREG(stat.st_mode):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Tile file not found.",
         )
 
-    return resolved_path
+    return Path(resolved_path), stat
+
+
+@app.get("/readiness")
+def readiness() -> dict[str, str]:
+    """Report whether the model is loaded and warmed up."""
+    if not _warm:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model is not ready yet.",
+        )
+
+    return {"status": "ready"}
+
+
+@lru_cache(maxsize=TILE_CACHE_SIZE)
+def _read_tile_version(path: str, mtime_ns: int, size: int) -> np.ndarray:
+    """Validate and load one version of a tile, identified by its stat key.
+
+    The returned array is shared between requests, so it is made read-only.
+    """
+    tile_path = Path(path)
+    validate_raster(tile_path)
+    tile = load_tile(tile_path)
+    tile.setflags(write=False)
+    return tile
+
+
+def _read_tile(tile_path: Path, stat: os.stat_result) -> np.ndarray:
+    """Validate and load a tile, reusing the cached array if it is unchanged."""
+    return _read_tile_version(str(tile_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _validate_and_read_tile(user_path: str) -> tuple[Path, np.ndarray]:
+    """Validate a user-provided tile path, then load its tile.
+
+    Both steps touch the filesystem, so they run together in one worker thread.
+    """
+    tile_path, tile_stat = _validate_tile_path(user_path)
+    return tile_path, _read_tile(tile_path, tile_stat)
+
+
+def _preload_tile_cache() -> None:
+    """Load the tiles listed in PRELOAD_TILE_CACHE into the tile cache."""
+    user_paths = [path.strip() for path in PRELOAD_TILE_CACHE.split(",")]
+
+    for user_path in filter(None, user_paths):
+        try:
+            _validate_and_read_tile(user_path)
+        except Exception as exc:
+            logger.warning("Failed to preload tile %s | error=%s", user_path, exc)
 
 
 @app.post("/infer", response_model=InferenceResponse)
-def infer_tile(request: InferenceRequest) -> dict[str, str | float | int]:
-    """Run inference on a single satellite image tile."""
-    tile_path = _validate_tile_path(request.tile_path)
+async def infer_tile(request: InferenceRequest) -> ORJSONResponse:
+    """Run inference on a single satellite image tile.
+
+    Validation, disk I/O, and the batched prediction all run in worker threads,
+    so only cheap request handling and metrics updates happen on the event loop.
 
+    The inbound request is validated by Pydantic, but the response is built from
+    trusted server-side values and returned directly, skipping FastAPI's response
+    model validation; ``response_model`` still documents its schema.
+    """
     try:
-        validate_raster(tile_path)
-        tile = load_tile(tile_path)
+        tile_path, tile = await asyncio.to_thread(
+            _validate_and_read_tile, request.tile_path
+        )
     except (PipelineError, ValueError) as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(exc),
         ) from exc
 
-    current_model = model
-    if current_model is None:
+    current_batcher = batcher
+    if current_batcher is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Model is not loaded. Please try again later.",
         )
 
-    with Timer() as timer:
-        result = predict(tile, current_model)
+    started = start_timer()
+    result = await current_batcher.predict(tile)
+    duration = elapsed_seconds(started)
 
     metrics.increment("api_requests_success")
-    metrics.record_timing("api_inference_seconds", timer.duration or 0.0)
+    metrics.record_timing("api_inference_seconds", duration)
 
     logger.info(
         "Inference succeeded | tile=%s | duration=%.4fs",
         tile_path.name,
-        timer.duration or 0.0,
+        duration,
     )
 
-    return {
-        "prediction": result["prediction"],
-        "mean_intensity": result["mean_intensity"],
-        "model_path": str(MODEL_PATH),
-    }
+    return ORJSONResponse(
+        {
+            "prediction": result["prediction"],
+            "mean_intensity": result["mean_intensity"],
+            "model_path": str(MODEL_PATH),
+        }
+    )
@@ -0,0 +1,155 @@
+"""
+Dynamic micro-batching for online inference.
+
+Key design decisions:
+- Coalesce concurrent single-tile requests into one vectorized prediction, so
+  throughput under load scales with the batch size rather than the request rate.
+- Bound the added latency: a batch is flushed as soon as it reaches
+  ``max_batch_size`` or ``max_latency_ms`` after its first request, whichever
+  comes first.
+- Group tiles by shape and dtype before stacking, so heterogeneous requests in
+  the same window never fail each other.
+- Stack tiles in their native dtype, like the batch pipeline's buffers, so that
+  online and batch predictions are identical for the same tile.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+
+import numpy as np
+
+from model.inferences import Predictions, predict_batch
+from utils.logging import setup_logger
+from utils.types_ import Model
+
+logger = setup_logger(__name__)
+
+_PendingRequest = tuple[np.ndarray, "asyncio.Future[Predictions]"]
+_TileLayout = tuple[tuple[int, ...], np.dtype]
+
+
+class MicroBatcher:
+    """Background queue batching concurrent predictions for a single model."""
+
+    def __init__(
+        self, model: Model, max_batch_size: int, max_latency_ms: float
+    ) -> None:
+        """Initialize the batcher; call ``start`` from a running event loop."""
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be a positive integer")
+        if max_latency_ms < 0:
+            raise ValueError("max_latency_ms must not be negative")
+
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency_seconds = max_latency_ms / 1000
+        self._queue: asyncio.Queue[_PendingRequest] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+        # Requests taken off the queue whose batch is being collected or predicted.
+        self._batch: list[_PendingRequest] = []
+
+    def start(self) -> None:
+        """Start the background task draining the request queue."""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task and fail every request not yet resolved.
+
+        This covers both the requests waiting in the queue and those of the
+        batch being collected or predicted when the task was cancelled.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(
+                    RuntimeError("Inference service is shutting down.")
+                )
+
+    async def predict(self, tile: np.ndarray) -> Predictions:
+        """Queue a tile for the next batch and wait for its prediction."""
+        future: asyncio.Future[Predictions] = asyncio.get_running_loop().create_future()
+        await self._queue.put((tile, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Collect requests into batches and dispatch them until cancelled."""
+        while True:
+            batch = await self._collect_batch()
+            await self._dispatch(batch)
+            self._batch = []
+
+    async def _collect_batch(self) -> list[_PendingRequest]:
+        """Wait for a first request, then gather more until the batch is flushed."""
+        loop = asyncio.get_running_loop()
+        batch = self._batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_latency_seconds
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            # asyncio.wait leaves a timed-out get pending instead of racing its result
+            # like wait_for can on older Python versions; cancelling a pending get is
+            # safe because the queue only hands the item over once the get resumes.
+            getter = asyncio.ensure_future(self._queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+            if not done:
+                getter.cancel()
+                break
+            batch.append(getter.result())
+
+        return batch
+
+    async def _dispatch(self, batch: list[_PendingRequest]) -> None:
+        """Run one prediction per tile layout and resolve each request's future.
+
+        Stacking and prediction run in a worker thread so the event loop keeps
+        accepting requests, which queue up for the next batch in the meantime.
+        """
+        groups: defaultdict[_TileLayout, list[_PendingRequest]] = defaultdict(list)
+        for tile, future in batch:
+            groups[tile.shape, tile.dtype].append((tile, future))
+
+        for requests in groups.values():
+            futures = [future for _, future in requests]
+            try:
+                batch_predictions = await asyncio.to_thread(
+                    predict_batch, [tile for tile, _ in requests], self.model
+                )
+            except Exception as exc:
+                logger.error(
+                    "Batched inference failed | batch_size=%d | error=%s",
+                    len(requests),
+                    exc,
+                )
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for future, label, mean_intensity in zip(
+                futures,
+                batch_predictions["predictions"].tolist(),
+                batch_predictions["mean_intensities"].tolist(),
+                strict=True,
+            ):
+                # A client may have disconnected and cancelled its request.
+                if not future.done():
+                    future.set_result(
+                        {"prediction": label, "mean_intensity": mean_intensity}
+                    )
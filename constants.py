@@ -2,9 +2,13 @@
 
 from pathlib import Path
 
-DATA_DIRECTORY = Path(__file__).resolve().parent / "data"
+PROJECT_ROOT: Path = Path(__file__).resolve().parent
+DATA_DIRECTORY: Path = PROJECT_ROOT / "data"
 RAW_DATA_DIRECTORY: Path = DATA_DIRECTORY / "raw"
 TILES_DIRECTORY: Path = DATA_DIRECTORY / "tiles"
-MODELS_DIRECTORY: Path = Path(__file__).resolve().parent / "model" / "models"
+TILE_STACK_FILE = "tiles.npy"
+TILE_STACK_METADATA_FILE = "tiles.json"
+MODELS_DIRECTORY: Path = PROJECT_ROOT / "model" / "models"
+DEFAULT_TILE_SIZE = 256
 TILES_INFERRED = "tiles_inferred"
 TILES_FAILED = "tiles_failed"
@@ -3,45 +3,118 @@ Batch inference module for satellite image tiles.
 
 Key design decisions:
 - Load a single immutable model artifact per batch run.
-- Process tiles sequentially to keep memory usage predictable.
+- Process tiles in fixed-size batches read in place into two reusable buffers
+  to amortize per-call overhead while keeping memory usage predictable.
+- Keep 8- and 16-bit integer tiles in their native dtype in the batch buffers
+  and only widen them inside the reduction, which sums them exactly in int64,
+  cutting memory traffic up to 4x. Floating-point tiles are read as float32.
+- Size the buffers from the first tile; a tile whose shape or dtype does not
+  fit them is read on its own and inferred separately rather than failed.
+- Overlap reading the next batch with inference on the current one using a
+  thread pool; threads suffice because rasterio releases the GIL while reading.
+- Optionally fan batches out to worker processes, each loading the model once,
+  for CPU-bound inference; results are consumed in submission order so the
+  output stays deterministic.
 - Keep inference stateless and deterministic.
 - Persist per-tile predictions together with model version metadata to support
   traceability and reproducibility.
+- Stream per-tile predictions to newline-delimited JSON as batches complete, so
+  memory stays constant regardless of the number of tiles.
 """
 
-import json
+import logging
 import uuid
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import compress
 from pathlib import Path
+from typing import TypedDict
+
+import numpy as np
+import orjson
 
 from constants import MODELS_DIRECTORY, TILES_DIRECTORY, TILES_FAILED, TILES_INFERRED
+from core_pipeline.exceptions import TileLayoutError
 from core_pipeline.observability import (
     MetricsRecorder,
     Timer,
     build_monitoring_metrics,
+    elapsed_seconds,
+    start_timer,
 )
 from core_pipeline.validate import validate_raster
 from model.health import check_model_health
-from model.inferences import Predictions, load_model, predict
-from utils.data import load_tile
+from model.inferences import (
+    BatchPredictions,
+    Predictions,
+    allocate_batch_predictions,
+    load_model,
+    predict_batch,
+)
+from utils.data import list_tiles, load_tile, read_tile_layout, tile_array_dtype
 from utils.logging import setup_logger
+from utils.types_ import Model
 
 logger = setup_logger(__name__)
 metrics = MetricsRecorder()
 
+# Per-process state of batch inference worker processes, set by _init_worker.
+_worker_model: Model | None = None
+_worker_buffer: np.ndarray | None = None
+_worker_outputs: BatchPredictions | None = None
+
+
+class _BatchResult(TypedDict):
+    """Outcome of reading and inferring one batch of tiles."""
+
+    tile_paths: list[Path]  # Tiles that were read and inferred.
+    failures: list[tuple[Path, str]]  # Tiles that failed, with the error message.
+    predictions: BatchPredictions | None  # None when no tile was inferred.
+    inference_seconds: float
+
+
+# A tile that did not fit the batch buffer, or None, and the load error, if any.
+_TileLoad = tuple[np.ndarray | None, str | None]
+
 
 def run_batch_inference(
     tiles_directory: Path,
     model_path: Path,
     output_path: Path,
+    batch_size: int = 32,
+    io_workers: int = 4,
+    num_workers: int = 1,
 ) -> None:
-    """Run batch inference on all tiles in a directory and save predictions."""
+    """Run batch inference on all tiles in a directory and save predictions.
+
+    Per-tile predictions are streamed to ``output_path`` with an ``.ndjson``
+    suffix, and ``output_path`` receives the batch-level metadata, so it must
+    not have that suffix itself.
+
+    Tiles are stacked into batches of ``batch_size`` so that the model runs one
+    vectorized call per batch rather than one call per tile. With a single
+    worker, tiles are validated and read in place into a preallocated batch
+    buffer by ``io_workers`` threads, so that reading the next batch overlaps with
+    inference on the current one. With ``num_workers`` greater than one, batches
+    are distributed across that many worker processes instead.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+    if io_workers <= 0:
+        raise ValueError("io_workers must be a positive integer")
+    if num_workers <= 0:
+        raise ValueError("num_workers must be a positive integer")
+
+    predictions_path = output_path.with_suffix(".ndjson")
+    if predictions_path == output_path:
+        raise ValueError("output_path must not have an .ndjson suffix")
+
     metrics.reset()  # Reset metrics at the start to prevent unbounded memory growth.
 
     run_id = str(uuid.uuid4())
 
     model = load_model(str(model_path))
-    results = []
-    tile_paths = sorted(tiles_directory.glob("*.tif"))
+    tile_paths = list_tiles(tiles_directory)
 
     if not tile_paths:
         raise FileNotFoundError(f"No tiles found in {tiles_directory}")
@@ -53,79 +126,359 @@ def run_batch_inference(
         model_path,
     )
 
-    with Timer() as batch_timer:
-        for tile_path in tile_paths:
-            try:
-                validate_raster(tile_path)
-                tile = load_tile(tile_path)
+    batches = [
+        tile_paths[start : start + batch_size]
+        for start in range(0, len(tile_paths), batch_size)
+    ]
+    # Tiles share a uniform layout, so buffers sized from one tile serve the run.
+    tile_shape, tile_dtype = _read_batch_tile_layout(tile_paths)
+    buffer_dtype = tile_array_dtype(tile_dtype)
 
-                with Timer() as prediction_timer:
-                    prediction = predict(tile, model)
-
-                metrics.increment(TILES_INFERRED)
-                metrics.increment(f"prediction_{prediction['prediction']}")
-                metrics.record_timing(
-                    "inference_time_seconds", prediction_timer.duration or 0.0
-                )
-                metrics.record_value("mean_intensity", prediction["mean_intensity"])
+    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-                results.append(_get_result(model_path, prediction, tile_path, run_id))
+    with (
+        Timer() as batch_timer,
+        open(predictions_path, "wb") as predictions_file,
+    ):
+        if num_workers == 1:
+            batch_results = _iter_threaded_batches(
+                batches, tile_shape, buffer_dtype, batch_size, io_workers, model
+            )
+        else:
+            batch_results = _iter_multiprocess_batches(
+                batches, tile_shape, buffer_dtype, batch_size, num_workers, model_path
+            )
 
-            except Exception as exc:
-                logger.error(
-                    "Inference failed for tile %s | error=%s",
-                    tile_path.name,
-                    exc,
+        for batch_result in batch_results:
+            _record_batch(batch_result)
+            predictions = batch_result["predictions"]
+            if predictions is not None:
+                predictions_file.write(
+                    _serialize_batch(
+                        predictions, batch_result["tile_paths"], model_path, run_id
+                    )
                 )
-                metrics.increment(TILES_FAILED)
 
     metrics.record_timing("batch_duration_seconds", batch_timer.duration or 0.0)
 
     monitoring = build_monitoring_metrics(model, metrics)
+    counters = metrics.counters
     health_report = check_model_health(model, monitoring)
 
-    # Structure output with batch-level metadata and results.
+    # Structure output with batch-level metadata; predictions were streamed.
     output = {
         "metadata": {
             "run_id": run_id,
             "model_path": str(model_path),
             "tiles_directory": str(tiles_directory),
-            "tiles_inferred": metrics.counters.get(TILES_INFERRED, 0),
-            "tiles_failed": metrics.counters.get(TILES_FAILED, 0),
+            "tiles_inferred": counters.get(TILES_INFERRED, 0),
+            "tiles_failed": counters.get(TILES_FAILED, 0),
             "batch_duration_seconds": batch_timer.duration or 0.0,
+            "predictions_path": str(predictions_path),
             "monitoring": monitoring,
             "health_report": health_report,
         },
-        "predictions": results,
     }
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        json.dump(output, f, indent=2)
+    with open(output_path, "wb") as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
 
     logger.info(
         "Batch inference completed | run_id=%s | tiles=%d | failed=%d | duration=%.3fs",
         run_id,
-        metrics.counters.get(TILES_INFERRED, 0),
-        metrics.counters.get(TILES_FAILED, 0),
+        counters.get(TILES_INFERRED, 0),
+        counters.get(TILES_FAILED, 0),
         batch_timer.duration or 0.0,
     )
 
     logger.info("Monitoring metrics: %s", monitoring)
-    logger.info("Metrics snapshot: %s", metrics.snapshot())
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Metrics snapshot: %s", metrics.snapshot())
     for recommendation in health_report["recommendations"]:
         logger.info("Recommendation: %s", recommendation)
 
 
+def _read_batch_tile_layout(
+    tile_paths: list[Path],
+) -> tuple[tuple[int, int, int], np.dtype]:
+    """Return the shape and dtype of the first readable tile, used for buffers."""
+    for tile_path in tile_paths:
+        try:
+            return read_tile_layout(tile_path)
+        except Exception:  # Unreadable tiles are reported when they are loaded.
+            continue
+
+    raise FileNotFoundError(f"No readable tiles found among {len(tile_paths)} tiles")
+
+
+def _iter_threaded_batches(
+    batches: list[list[Path]],
+    tile_shape: tuple[int, int, int],
+    buffer_dtype: np.dtype,
+    batch_size: int,
+    io_workers: int,
+    model: Model,
+) -> Iterator[_BatchResult]:
+    """Infer batches in this process, reading the next batch while inferring.
+
+    Two buffers alternate: one is inferred on while the next batch is read into
+    the other by the I/O thread pool. Prediction arrays are reused too, so each
+    yielded result is only valid until the next one is requested.
+    """
+    buffers = [
+        np.empty((batch_size, *tile_shape), dtype=buffer_dtype) for _ in range(2)
+    ]
+    outputs = allocate_batch_predictions(batch_size)
+
+    with ThreadPoolExecutor(
+        max_workers=io_workers, thread_name_prefix="tile-io"
+    ) as io_pool:
+        pending = _submit_batch(io_pool, batches[0], buffers[0])
+
+        for index, batch_paths in enumerate(batches):
+            futures = pending
+            if index + 1 < len(batches):
+                pending = _submit_batch(
+                    io_pool, batches[index + 1], buffers[(index + 1) % 2]
+                )
+
+            loads = [_load_result(future) for future in futures]
+            yield _infer_loaded_batch(
+                buffers[index % 2], batch_paths, loads, model, outputs
+            )
+
+
+def _iter_multiprocess_batches(
+    batches: list[list[Path]],
+    tile_shape: tuple[int, int, int],
+    buffer_dtype: np.dtype,
+    batch_size: int,
+    num_workers: int,
+    model_path: Path,
+) -> Iterator[_BatchResult]:
+    """Infer batches across worker processes, yielding results in order."""
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_worker,
+        initargs=(model_path, tile_shape, buffer_dtype, batch_size),
+    ) as pool:
+        yield from pool.map(_infer_batch_in_worker, batches)
+
+
+def _init_worker(
+    model_path: Path,
+    tile_shape: tuple[int, int, int],
+    buffer_dtype: np.dtype,
+    batch_size: int,
+) -> None:
+    """Load the model and allocate the batch buffers once per worker process."""
+    global _worker_model, _worker_buffer, _worker_outputs
+
+    _worker_model = load_model(str(model_path))
+    _worker_buffer = np.empty((batch_size, *tile_shape), dtype=buffer_dtype)
+    _worker_outputs = allocate_batch_predictions(batch_size)
+
+
+def _infer_batch_in_worker(batch_paths: list[Path]) -> _BatchResult:
+    """Read and infer one batch in a worker process."""
+    if _worker_model is None or _worker_buffer is None or _worker_outputs is None:
+        raise RuntimeError("Batch inference worker was not initialized.")
+
+    loads: list[_TileLoad] = []
+    for row, tile_path in enumerate(batch_paths):
+        try:
+            loads.append((_load_validated_tile(tile_path, _worker_buffer[row]), None))
+        except Exception as exc:
+            loads.append((None, str(exc)))
+
+    # The result is pickled back to the parent before the next task reuses the
+    # output arrays.
+    return _infer_loaded_batch(
+        _worker_buffer, batch_paths, loads, _worker_model, _worker_outputs
+    )
+
+
+def _load_validated_tile(tile_path: Path, out: np.ndarray) -> np.ndarray | None:
+    """Validate a tile and read it into ``out``.
+
+    A tile whose shape or dtype does not fit ``out`` is read on its own instead
+    and returned, to be inferred separately from the rest of its batch.
+    """
+    validate_raster(tile_path)
+    try:
+        load_tile(tile_path, out=out)
+    except TileLayoutError:
+        return load_tile(tile_path)
+
+    return None
+
+
+def _submit_batch(
+    io_pool: ThreadPoolExecutor,
+    batch_paths: list[Path],
+    buffer: np.ndarray,
+) -> list[Future[np.ndarray | None]]:
+    """Schedule reading each tile of a batch into its row of the buffer."""
+    return [
+        io_pool.submit(_load_validated_tile, tile_path, buffer[row])
+        for row, tile_path in enumerate(batch_paths)
+    ]
+
+
+def _load_result(future: Future[np.ndarray | None]) -> _TileLoad:
+    """Wait for a tile to be read and return how it was loaded."""
+    try:
+        return future.result(), None
+    except Exception as exc:
+        return None, str(exc)
+
+
+def _infer_loaded_batch(
+    buffer: np.ndarray,
+    batch_paths: list[Path],
+    loads: list[_TileLoad],
+    model: Model,
+    outputs: BatchPredictions,
+) -> _BatchResult:
+    """Run inference on the tiles of a batch that were read without error."""
+    errors = [error for _, error in loads]
+    loaded = [error is None for error in errors]
+    inferred_paths = list(compress(batch_paths, loaded))
+    result: _BatchResult = {
+        "tile_paths": [],
+        "failures": [
+            (tile_path, error)
+            for tile_path, error in zip(batch_paths, errors, strict=True)
+            if error is not None
+        ],
+        "predictions": None,
+        "inference_seconds": 0.0,
+    }
+    if not inferred_paths:
+        return result
+
+    separate_tiles = [tile for tile, _ in loads]
+    tiles = buffer[: len(batch_paths)]
+
+    started = start_timer()
+    try:
+        if any(tile is not None for tile in separate_tiles):
+            predictions = _predict_with_separate_tiles(
+                tiles, loaded, separate_tiles, model
+            )
+        else:
+            if len(inferred_paths) < len(batch_paths):
+                tiles = tiles[loaded]
+            predictions = predict_batch(tiles, model, out=outputs)
+    except Exception as exc:
+        result["failures"].extend(
+            (tile_path, f"batch inference failed: {exc}")
+            for tile_path in inferred_paths
+        )
+        return result
+
+    result["tile_paths"] = inferred_paths
+    result["predictions"] = predictions
+    result["inference_seconds"] = elapsed_seconds(started)
+    return result
+
+
+def _predict_with_separate_tiles(
+    tiles: np.ndarray,
+    loaded: list[bool],
+    separate_tiles: list[np.ndarray | None],
+    model: Model,
+) -> BatchPredictions:
+    """Predict the loaded tiles of a batch, some of which were read on their own.
+
+    Tiles read into the buffer are still predicted in one vectorized call, and
+    the results keep the order of the batch.
+    """
+    rows = list(compress(range(len(loaded)), loaded))
+    predictions = allocate_batch_predictions(len(rows))
+
+    buffered = [
+        position for position, row in enumerate(rows) if separate_tiles[row] is None
+    ]
+    if buffered:
+        buffered_predictions = predict_batch(
+            tiles[[rows[position] for position in buffered]], model
+        )
+        for name in ("predictions", "mean_intensities"):
+            predictions[name][buffered] = buffered_predictions[name]
+
+    for position, row in enumerate(rows):
+        tile = separate_tiles[row]
+        if tile is not None:
+            tile_predictions = predict_batch(tile[np.newaxis], model)
+            for name in ("predictions", "mean_intensities"):
+                predictions[name][position] = tile_predictions[name][0]
+
+    return predictions
+
+
+def _record_batch(batch_result: _BatchResult) -> None:
+    """Log failures and record the metrics of one batch."""
+    for tile_path, error in batch_result["failures"]:
+        logger.error(
+            "Inference failed for tile %s | error=%s",
+            tile_path.name,
+            error,
+        )
+        metrics.increment(TILES_FAILED)
+
+    predictions = batch_result["predictions"]
+    if predictions is None:
+        return
+
+    # One sample per batch, since tiles are predicted in one vectorized call.
+    metrics.record_timing(
+        "batch_inference_time_seconds", batch_result["inference_seconds"]
+    )
+    metrics.increment(TILES_INFERRED, len(batch_result["tile_paths"]))
+
+    labels, counts = np.unique(predictions["predictions"], return_counts=True)
+    for label, count in zip(labels.tolist(), counts.tolist(), strict=True):
+        metrics.increment(f"prediction_{label}", count)
+    for mean_intensity in predictions["mean_intensities"].tolist():
+        metrics.record_value("mean_intensity", mean_intensity)
+
+
+def _serialize_batch(
+    batch_predictions: BatchPredictions,
+    tile_paths: list[Path],
+    model_path: Path,
+    run_id: str,
+) -> bytes:
+    """Serialize a batch of predictions as newline-delimited JSON records."""
+    return b"".join(
+        orjson.dumps(
+            _get_result(
+                model_path,
+                {"prediction": label, "mean_intensity": mean_intensity},
+                tile_path.stem,
+                run_id,
+            ),
+            option=orjson.OPT_APPEND_NEWLINE,
+        )
+        for tile_path, label, mean_intensity in zip(
+            tile_paths,
+            batch_predictions["predictions"].tolist(),
+            batch_predictions["mean_intensities"].tolist(),
+            strict=True,
+        )
+    )
+
+
 def _get_result(
     model_path: Path,
     prediction: Predictions,
-    tile_path: Path,
+    tile_id: str,
     run_id: str,
 ) -> dict[str, str | float | int]:
     """Return prediction and confidence proxy for a tile."""
     return {
-        "tile_id": tile_path.stem,
+        "tile_id": tile_id,
         "run_id": run_id,
         "model_path": str(model_path),
         "prediction": prediction["prediction"],
@@ -46,3 +46,11 @@ class InvalidRasterDimensionsError(PipelineError):
         """Initializes the exception with a specific message."""
         message = f"Invalid raster dimensions: width={width}, height={height}"
         super().__init__(message)
+
+
+class TileLayoutError(PipelineError, ValueError):
+    """Raised when a tile cannot be read into a buffer of another layout."""
+
+    def __init__(self, message: str) -> None:
+        """Initializes the exception with a specific message."""
+        super().__init__(message)
@@ -3,7 +3,8 @@ Observability utilities for logging and metrics.
 
 Key design decisions:
 - Use standard Python logging for portability.
-- Keep metrics lightweight and in-process.
+- Keep metrics lightweight and in-process, with memory bounded by the number of
+  metric names rather than the number of measurements.
 - Avoid external dependencies to keep the demo simple.
 - Expose a small, explicit API for recording metrics.
 """
@@ -12,43 +13,91 @@ from __future__ import annotations
 
 import threading
 import time
-from statistics import fmean, pstdev
+from collections import defaultdict
+from collections.abc import Iterable
 from types import TracebackType
+from typing import TypedDict
 
 from constants import TILES_INFERRED
+from utils.stats import MeanStdSketch
 from utils.types_ import Model, MonitoringMetrics
 
+_EMPTY_SKETCH = MeanStdSketch()
+
+
+class AggregateSummary(TypedDict):
+    """Summary statistics of a series of measurements."""
+
+    count: int
+    mean: float
+    std: float
+
+
+class _ThreadMetrics:
+    """Metrics recorded by a single thread, merged when the recorder is read."""
+
+    __slots__ = ("counters", "timings", "values")
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.counters: defaultdict[str, int] = defaultdict(int)
+        self.timings: dict[str, MeanStdSketch] = {}
+        self.values: dict[str, MeanStdSketch] = {}
+
 
 class MetricsRecorder:
     """In-memory recorder for simple counters and timings.
 
-    Thread-safe implementation using locks to prevent race conditions in concurrent
-    environments like FastAPI with multiple workers.
+    Thread-safe implementation for concurrent environments like FastAPI with
+    multiple workers. Metrics are striped per thread, so recording them never
+    takes a lock; the stripes are only merged when metrics are read.
+
+    Timings and values are kept as running aggregates rather than individual
+    measurements, so memory stays constant however many are recorded.
     """
 
     def __init__(self) -> None:
         """Initialize the metrics recorder."""
-        self.counters: dict[str, int] = {}
-        self.timings: dict[str, list[float]] = {}
-        self.values: dict[str, list[float]] = {}
         self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_metrics: list[_ThreadMetrics] = []
+        self._generation = 0
+
+    @property
+    def counters(self) -> dict[str, int]:
+        """Return the counters merged across all threads."""
+        merged: defaultdict[str, int] = defaultdict(int)
+        for thread_metrics in list(self._thread_metrics):
+            # Copy first: the owning thread may keep recording meanwhile.
+            for name, value in dict(thread_metrics.counters).items():
+                merged[name] += value
+        return dict(merged)
+
+    @property
+    def timings(self) -> dict[str, MeanStdSketch]:
+        """Return the timing aggregates merged across all threads."""
+        return _merge_aggregates(
+            thread_metrics.timings for thread_metrics in list(self._thread_metrics)
+        )
+
+    @property
+    def values(self) -> dict[str, MeanStdSketch]:
+        """Return the value aggregates merged across all threads."""
+        return _merge_aggregates(
+            thread_metrics.values for thread_metrics in list(self._thread_metrics)
+        )
 
     def increment(self, name: str, value: int = 1) -> None:
         """Increment a named counter in a thread-safe manner."""
-        with self._lock:
-            self.counters[name] = self.counters.get(name, 0) + value
+        self._get_thread_metrics().counters[name] += value
 
     def record_timing(self, name: str, duration: float) -> None:
         """Record a timing measurement in seconds.
 
-        Stores individual timing measurements to allow calculation of statistics like
-        average, min, max, and percentiles.
+        Timings are folded into a running ``MeanStdSketch`` per name, from which
+        ``summarize`` reads their count, mean, and standard deviation.
         """
-        with self._lock:
-            timings = self.timings
-            if name not in timings:
-                timings[name] = []
-            timings[name].append(duration)
+        _add_to_aggregate(self._get_thread_metrics().timings, name, duration)
 
     def record_value(self, name: str, value: float) -> None:
         """Record an arbitrary numeric value.
@@ -56,43 +105,81 @@ class MetricsRecorder:
         Useful for capturing metrics that are aggregated later, such as prediction
         confidences or feature statistics.
         """
-        with self._lock:
-            values = self.values
-            if name not in values:
-                values[name] = []
-            values[name].append(value)
+        _add_to_aggregate(self._get_thread_metrics().values, name, value)
 
     def reset(self) -> None:
-        """Reset all metrics to prevent unbounded memory growth.
+        """Reset all metrics.
 
         Useful in batch processing scenarios to clear metrics between runs.
         """
         with self._lock:
-            self.counters.clear()
-            self.timings.clear()
-            self.values.clear()
+            # Threads register fresh metrics on their next recording.
+            self._thread_metrics = []
+            self._generation += 1
 
-    def snapshot(self) -> dict[str, dict[str, float] | dict[str, int]]:
+    def snapshot(
+        self,
+    ) -> dict[str, dict[str, int] | dict[str, AggregateSummary]]:
         """Return a snapshot of all recorded metrics."""
-        with self._lock:
-            return {
-                "counters": dict(self.counters),
-                "timings": {key: list(values) for key, values in self.timings.items()},
-                "values": {key: list(values) for key, values in self.values.items()},
-            }
+        return {
+            "counters": self.counters,
+            "timings": {
+                name: summarize(aggregate) for name, aggregate in self.timings.items()
+            },
+            "values": {
+                name: summarize(aggregate) for name, aggregate in self.values.items()
+            },
+        }
+
+    def _get_thread_metrics(self) -> _ThreadMetrics:
+        """Return the calling thread's metrics, registering them on first use."""
+        local = self._local
+        if getattr(local, "generation", None) != self._generation:
+            with self._lock:
+                local.metrics = _ThreadMetrics()
+                local.generation = self._generation
+                self._thread_metrics.append(local.metrics)
+        return local.metrics
+
+
+def summarize(sketch: MeanStdSketch) -> AggregateSummary:
+    """Return the count, mean, and population standard deviation of a sketch."""
+    return {"count": sketch.count, "mean": sketch.mean, "std": sketch.std}
+
+
+def _add_to_aggregate(
+    aggregates: dict[str, MeanStdSketch], name: str, value: float
+) -> None:
+    """Add one measurement to a named running aggregate."""
+    aggregates[name] = aggregates.get(name, _EMPTY_SKETCH).add(value)
+
+
+def _merge_aggregates(
+    aggregates_per_thread: Iterable[dict[str, MeanStdSketch]],
+) -> dict[str, MeanStdSketch]:
+    """Merge per-thread running aggregates by name."""
+    merged: dict[str, MeanStdSketch] = {}
+    for aggregates in aggregates_per_thread:
+        for name, sketch in dict(aggregates).items():
+            merged[name] = merged.get(name, _EMPTY_SKETCH).merge(sketch)
+    return merged
 
 
 class Timer:
-    """Context manager for timing code blocks."""
+    """Context manager for timing code blocks.
+
+    Hot paths can use ``start_timer`` and ``elapsed_seconds`` instead, which
+    skip the context manager protocol and the attribute writes of a ``Timer``.
+    """
 
     def __init__(self) -> None:
         """Initialize the timer."""
-        self.start: float | None = None
+        self.start_ns: int | None = None
         self.duration: float | None = None
 
     def __enter__(self) -> Timer:
         """Enter the context manager."""
-        self.start = time.perf_counter()
+        self.start_ns = time.perf_counter_ns()
         return self
 
     def __exit__(
@@ -102,11 +189,21 @@ class Timer:
         traceback: TracebackType | None,
     ) -> bool:
         """Exit the context manager."""
-        if self.start is not None:
-            self.duration = time.perf_counter() - self.start
+        if self.start_ns is not None:
+            self.duration = elapsed_seconds(self.start_ns)
         return False
 
 
+def start_timer() -> int:
+    """Return a timestamp in nanoseconds to pass to ``elapsed_seconds``."""
+    return time.perf_counter_ns()
+
+
+def elapsed_seconds(start_ns: int) -> float:
+    """Return the seconds elapsed since a ``start_timer`` timestamp."""
+    return (time.perf_counter_ns() - start_ns) / 1e9
+
+
 def build_monitoring_metrics(
     model: Model,
     metrics_recorder: MetricsRecorder,
@@ -119,20 +216,17 @@ def build_monitoring_metrics(
     prediction_bright = counters.get("prediction_1", 0)
     prediction_dark = counters.get("prediction_0", 0)
 
-    mean_intensities = values.get("mean_intensity", [])
-    mean_intensity_mean = fmean(mean_intensities) if mean_intensities else 0.0
-    mean_intensity_std = pstdev(mean_intensities) if len(mean_intensities) > 1 else 0.0
+    mean_intensities = values.get("mean_intensity", _EMPTY_SKETCH)
+    mean_intensity_mean = mean_intensities.mean
+    mean_intensity_std = mean_intensities.std
 
-    training_mean = model.get("training_mean", model.get("threshold"))
     training_std = model.get("training_std")
 
     drift = {
-        "mean_intensity_delta": None,
+        "mean_intensity_delta": mean_intensity_mean - float(model["threshold"]),
         "std_intensity_delta": None,
     }
 
-    if training_mean is not None:
-        drift["mean_intensity_delta"] = mean_intensity_mean - float(training_mean)
     if training_std is not None:
         drift["std_intensity_delta"] = mean_intensity_std - float(training_std)
 
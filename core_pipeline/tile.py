@@ -9,65 +9,377 @@ Key design decisions:
   simplifies downstream batch processing and ML inference.
 - Preserve geospatial metadata (CRS and affine transform) for each tile to ensure
   spatial correctness in downstream pipelines.
+- Write rows of tiles as independent tasks that can run in worker processes,
+  since tiling is embarrassingly parallel; tile ids are derived from positions,
+  so the output is identical regardless of the number of workers. Each worker
+  opens the source and allocates its segment buffer once, not once per row.
+- Alternatively, write all tiles as the internal blocks of one tiled GeoTIFF,
+  which avoids creating one file per tile.
+- For consumers that do not need georeferenced tiles, write all tiles into one
+  contiguous ``.npy`` stack, with their transforms kept in a JSON companion.
+- Read each row of tiles in horizontal segments that fit a soft byte budget, so
+  wide rasters are read in few large windows without holding a whole row.
 """
 
 import logging
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
 from pathlib import Path
 
+import numpy as np
+import orjson
 import rasterio
+from rasterio.io import DatasetReader
 from rasterio.windows import Window
 
-from constants import RAW_DATA_DIRECTORY, TILES_DIRECTORY
+from constants import (
+    DEFAULT_TILE_SIZE,
+    RAW_DATA_DIRECTORY,
+    TILE_STACK_FILE,
+    TILE_STACK_METADATA_FILE,
+    TILES_DIRECTORY,
+)
 from core_pipeline.exceptions import TileSizeTypeError, TileSizeValueError
-from core_pipeline.validate import validate_raster
+from core_pipeline.validate import validate_crs, validate_raster
 
+STREAMING_BUFFER_BYTES = 256 << 20
 
-def generate_tiles(input_tif: Path, output_path: Path, tile_size: int = 256) -> None:
-    """Split a raster image into fixed-size tiles and write them to disk."""
+# Per-process state of tiling workers, set once by ``_init_worker``.
+_worker_resources = ExitStack()
+_worker_source: DatasetReader | None = None
+_worker_buffer: np.ndarray | None = None
+
+
+def generate_tiles(
+    input_tif: Path,
+    output_path: Path,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    num_workers: int = 1,
+    streaming_buffer_bytes: int = STREAMING_BUFFER_BYTES,
+) -> None:
+    """Split a raster image into fixed-size tiles and write them to disk.
+
+    Each row of tiles is written as an independent task. With ``num_workers``
+    greater than one, rows are distributed across that many worker processes.
+    Rows are read in segments of about ``streaming_buffer_bytes``, through one
+    source handle and one buffer per process.
+    """
+    validate_raster(input_tif)
+    _validate_tile_size(tile_size)
+    _validate_streaming_buffer_bytes(streaming_buffer_bytes)
+
+    if num_workers <= 0:
+        raise ValueError("num_workers must be a positive integer")
+
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    with _open_source(input_tif) as source:
+        validate_crs(source.crs)
+        columns = source.width // tile_size
+        # Partial rows and columns at image boundaries are skipped.
+        rows = range(0, source.height - tile_size + 1, tile_size)
+        first_tile_ids = [index * columns for index in range(len(rows))]
+
+        if num_workers == 1:
+            buffer = _allocate_segment_buffer(
+                source, tile_size, columns, streaming_buffer_bytes
+            )
+            tile_counts = [
+                _write_tile_row(
+                    source, buffer, output_path, tile_size, row, first_tile_id
+                )
+                for row, first_tile_id in zip(rows, first_tile_ids, strict=True)
+            ]
+
+    if num_workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=num_workers,
+            initializer=_init_worker,
+            initargs=(input_tif, tile_size, streaming_buffer_bytes),
+        ) as pool:
+            tile_counts = list(
+                pool.map(
+                    partial(_write_tile_row_in_worker, output_path, tile_size),
+                    rows,
+                    first_tile_ids,
+                    chunksize=max(1, len(rows) // (num_workers * 4)),
+                )
+            )
+
+    logging.info("Generated %d tiles", sum(tile_counts))
+
+
+def generate_tiled_raster(
+    input_tif: Path,
+    output_tif: Path,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    streaming_buffer_bytes: int = STREAMING_BUFFER_BYTES,
+) -> None:
+    """Write the full tiles of a raster image into a single tiled GeoTIFF.
+
+    Each tile becomes one internal block of the output, so a tile is read back
+    with the ``Window`` of its block rather than from a file of its own. Partial
+    tiles at image boundaries are cropped, like in ``generate_tiles``. Rows of
+    tiles are copied in segments of about ``streaming_buffer_bytes``.
+
+    :raises ValueError: If the raster is smaller than one tile.
+    """
     validate_raster(input_tif)
+    _validate_tile_size(tile_size)
+    _validate_streaming_buffer_bytes(streaming_buffer_bytes)
+
+    # GeoTIFF block dimensions must be multiples of 16 pixels.
+    if tile_size % 16:
+        raise ValueError("tile_size must be a multiple of 16 for a tiled GeoTIFF")
+
+    output_tif.parent.mkdir(parents=True, exist_ok=True)
+
+    with _open_source(input_tif) as source:
+        validate_crs(source.crs)
+        rows = source.height // tile_size
+        columns = source.width // tile_size
+        # GeoTIFFs cannot be empty, so a raster smaller than one tile is rejected.
+        if rows == 0 or columns == 0:
+            raise ValueError(
+                f"Raster of {source.width}x{source.height} pixels is smaller than "
+                f"one {tile_size}x{tile_size} tile"
+            )
+
+        meta = source.meta.copy()
+        meta.update(
+            {
+                "driver": "GTiff",
+                "height": rows * tile_size,
+                "width": columns * tile_size,
+                "tiled": True,
+                "blockxsize": tile_size,
+                "blockysize": tile_size,
+                "compress": "deflate",
+            }
+        )
+
+        buffer = _allocate_segment_buffer(
+            source, tile_size, columns, streaming_buffer_bytes
+        )
+        # Compress blocks on all cores, since a single process writes the file.
+        with (
+            rasterio.Env(GDAL_NUM_THREADS="ALL_CPUS"),
+            rasterio.open(output_tif, "w", **meta) as dst,
+        ):
+            for row in range(0, rows * tile_size, tile_size):
+                for window, segment in _read_row_segments(
+                    source, buffer, row, columns, tile_size
+                ):
+                    dst.write(segment, window=window)
+
+    logging.info("Generated tiled raster with %d tiles", rows * columns)
+
+
+def generate_tile_stack(
+    input_tif: Path,
+    output_path: Path,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    streaming_buffer_bytes: int = STREAMING_BUFFER_BYTES,
+) -> None:
+    """Write the full tiles of a raster image into a single ``.npy`` stack.
+
+    The stack has shape ``(tiles, bands, tile_size, tile_size)`` in the source
+    dtype and is indexed by tile id, numbered like in ``generate_tiles``. It is
+    filled through a memory map, so it never has to fit in memory. The CRS and
+    the affine transform of each tile are written to a JSON companion file.
+    """
+    validate_raster(input_tif)
+    _validate_tile_size(tile_size)
+    _validate_streaming_buffer_bytes(streaming_buffer_bytes)
+
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    with _open_source(input_tif) as source:
+        validate_crs(source.crs)
+        rows = source.height // tile_size
+        columns = source.width // tile_size
 
+        stack = np.lib.format.open_memmap(
+            output_path / TILE_STACK_FILE,
+            mode="w+",
+            dtype=source.dtypes[0],
+            shape=(rows * columns, source.count, tile_size, tile_size),
+        )
+        buffer = _allocate_segment_buffer(
+            source, tile_size, columns, streaming_buffer_bytes
+        )
+        transforms = []
+        tile_id = 0
+
+        for row in range(0, rows * tile_size, tile_size):
+            for window, segment in _read_row_segments(
+                source, buffer, row, columns, tile_size
+            ):
+                # Split the (bands, tile_size, n * tile_size) segment into n tiles.
+                count = window.width // tile_size
+                stack[tile_id : tile_id + count] = segment.reshape(
+                    source.count, tile_size, count, tile_size
+                ).transpose(2, 0, 1, 3)
+                tile_id += count
+
+                for column in range(
+                    window.col_off, window.col_off + window.width, tile_size
+                ):
+                    tile_window = Window(column, row, tile_size, tile_size)
+                    tile_transform = rasterio.windows.transform(
+                        tile_window, source.transform
+                    )
+                    transforms.append(list(tile_transform)[:6])
+
+        stack.flush()
+        metadata = {"crs": source.crs.to_string(), "transforms": transforms}
+
+    with open(output_path / TILE_STACK_METADATA_FILE, "wb") as f:
+        f.write(orjson.dumps(metadata))
+
+    logging.info("Generated tile stack with %d tiles", tile_id)
+
+
+def _validate_tile_size(tile_size: int) -> None:
+    """Ensure that the tile size is a positive integer number of pixels.
+
+    :raises TileSizeTypeError: If the tile size is not an integer.
+    :raises TileSizeValueError: If the tile size is not positive.
+    """
     if not isinstance(tile_size, int):
         raise TileSizeTypeError(tile_size)
     if tile_size <= 0:
         raise TileSizeValueError(tile_size)
 
-    output_path.mkdir(parents=True, exist_ok=True)
 
-    with rasterio.open(input_tif) as source:
-        width = source.width
-        height = source.height
-        transform = source.transform
+def _validate_streaming_buffer_bytes(streaming_buffer_bytes: int) -> None:
+    """Ensure that the streaming buffer budget is a positive number of bytes."""
+    if streaming_buffer_bytes <= 0:
+        raise ValueError("streaming_buffer_bytes must be a positive integer")
 
-        tile_id = 0
 
-        for row in range(0, height, tile_size):
-            for column in range(0, width, tile_size):
-                # Skip partial tiles at image boundaries
-                if row + tile_size > height or column + tile_size > width:
-                    continue
+@contextmanager
+def _open_source(input_tif: Path) -> Iterator[DatasetReader]:
+    """Open a source raster for tiling.
 
-                window = Window(column, row, tile_size, tile_size)
-                tile_data = source.read(window=window)
+    GDAL does not list the raster's directory looking for sidecar files, so
+    georeferencing must be embedded in the raster itself; callers check the CRS
+    again on the opened source. The dataset handle is private to the caller
+    rather than shared from GDAL's cache.
+    """
+    with (
+        rasterio.Env(GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR"),
+        rasterio.open(input_tif, sharing=False) as source,
+    ):
+        yield source
 
-                tile_transform = rasterio.windows.transform(window, transform)
 
-                tile_meta = source.meta.copy()
-                tile_meta.update(
-                    {
-                        "height": tile_size,
-                        "width": tile_size,
-                        "transform": tile_transform,
-                    }
-                )
+def _allocate_segment_buffer(
+    source: DatasetReader,
+    tile_size: int,
+    columns: int,
+    streaming_buffer_bytes: int,
+) -> np.ndarray:
+    """Allocate a row segment of whole tiles, reused by reads of every segment.
+
+    The segment spans as many of the ``columns`` tiles of a row as fit in
+    ``streaming_buffer_bytes``, and at least one tile.
+    """
+    dtype = np.dtype(source.dtypes[0])
+    bytes_per_tile = source.count * tile_size * tile_size * dtype.itemsize
+    tiles_per_segment = max(1, min(columns, streaming_buffer_bytes // bytes_per_tile))
+    return np.empty(
+        (source.count, tile_size, tiles_per_segment * tile_size), dtype=dtype
+    )
+
+
+def _read_row_segments(
+    source: DatasetReader,
+    buffer: np.ndarray,
+    row: int,
+    columns: int,
+    tile_size: int,
+) -> Iterator[tuple[Window, np.ndarray]]:
+    """Read the first ``columns`` tiles of a row one buffer-sized segment at a time.
+
+    Yields the window of each segment and a view of ``buffer`` holding it. The
+    buffer is overwritten by the next segment, so each view is only valid until
+    the iteration resumes.
+    """
+    segment_width = buffer.shape[2]
+    for column in range(0, columns * tile_size, segment_width):
+        width = min(segment_width, columns * tile_size - column)
+        window = Window(column, row, width, tile_size)
+        segment = buffer[:, :, :width]
+        source.read(window=window, out=segment)
+        yield window, segment
+
+
+def _init_worker(input_tif: Path, tile_size: int, streaming_buffer_bytes: int) -> None:
+    """Open the source and allocate the segment buffer once per worker process.
+
+    Rasterio datasets cannot be shared across processes, so each worker keeps
+    its own handle open until it exits.
+    """
+    global _worker_source, _worker_buffer
+
+    _worker_source = _worker_resources.enter_context(_open_source(input_tif))
+    _worker_buffer = _allocate_segment_buffer(
+        _worker_source,
+        tile_size,
+        _worker_source.width // tile_size,
+        streaming_buffer_bytes,
+    )
+
+
+def _write_tile_row_in_worker(
+    output_path: Path, tile_size: int, row: int, first_tile_id: int
+) -> int:
+    """Write one row of tiles in a worker process."""
+    if _worker_source is None or _worker_buffer is None:
+        raise RuntimeError("Tiling worker was not initialized.")
+
+    return _write_tile_row(
+        _worker_source, _worker_buffer, output_path, tile_size, row, first_tile_id
+    )
+
+
+def _write_tile_row(
+    source: DatasetReader,
+    buffer: np.ndarray,
+    output_path: Path,
+    tile_size: int,
+    row: int,
+    first_tile_id: int,
+) -> int:
+    """Write the full tiles of one row of the raster and return how many were written.
+
+    The row is read through ``buffer``, which is reused by every row.
+    """
+    transform = source.transform
+    # Only the transform differs between tiles, so the rest is built once.
+    base_meta = {**source.meta, "height": tile_size, "width": tile_size}
+    columns = source.width // tile_size
+    tile_id = first_tile_id
+
+    for segment_window, segment in _read_row_segments(
+        source, buffer, row, columns, tile_size
+    ):
+        for offset in range(0, segment_window.width, tile_size):
+            window = Window(segment_window.col_off + offset, row, tile_size, tile_size)
+            tile_transform = rasterio.windows.transform(window, transform)
+            tile_meta = {**base_meta, "transform": tile_transform}
 
-                tile_path = output_path / f"{tile_id:05d}.tif"
+            tile_path = output_path / f"{tile_id:05d}.tif"
 
-                with rasterio.open(tile_path, "w", **tile_meta) as dst:
-                    dst.write(tile_data)
+            with rasterio.open(tile_path, "w", **tile_meta) as dst:
+                dst.write(segment[:, :, offset : offset + tile_size])
 
-                tile_id += 1
+            tile_id += 1
 
-    logging.info("Generated %s tiles", tile_id)
+    return tile_id - first_tile_id
 
 
 if __name__ == "__main__":
@@ -75,5 +387,5 @@ if __name__ == "__main__":
     generate_tiles(
         input_tif=RAW_DATA_DIRECTORY / "sample.tif",
         output_path=TILES_DIRECTORY,
-        tile_size=256,
+        tile_size=DEFAULT_TILE_SIZE,
     )
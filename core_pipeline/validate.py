@@ -22,6 +22,15 @@ from rasterio.crs import CRS
 from constants import RAW_DATA_DIRECTORY
 from core_pipeline.exceptions import InvalidRasterDimensionsError, UndefinedCRSError
 
+ALLOWED_DTYPES: tuple[str, ...] = (
+    "uint8",
+    "uint16",
+    "int16",
+    "float32",
+    "float64",
+)
+_ALLOWED_DTYPE_SET = frozenset(ALLOWED_DTYPES)
+
 
 def validate_raster_exists(path: Path) -> None:
     """Ensure that the raster file exists on disk.
@@ -55,17 +64,10 @@ def validate_dtype(dtype: Any) -> None:
 
     :raises: ValueError if the raster data type is invalid.
     """
-    allowed_dtypes: tuple[str, ...] = (
-        "uint8",
-        "uint16",
-        "int16",
-        "float32",
-        "float64",
-    )
-
-    if dtype not in allowed_dtypes:
+    # Strings and NumPy dtypes both render as the dtype name.
+    if str(dtype) not in _ALLOWED_DTYPE_SET:
         raise ValueError(
-            f"Unsupported raster dtype '{dtype}'. Expected one of {allowed_dtypes}."
+            f"Unsupported raster dtype '{dtype}'. Expected one of {ALLOWED_DTYPES}."
         )
 
 
@@ -3,12 +3,15 @@ Model health checks for monitoring and maintenance.
 
 Key design decisions:
 - Compare live monitoring stats with training baselines.
-- Emit warnings when drift exceeds a configurable threshold.
+- Emit warnings when drift exceeds a configurable threshold, at most once per
+  ``WARNING_INTERVAL_SECONDS`` for the same condition so periodic checks do not
+  flood the logs; repeats are logged at debug level.
 - Log actionable recommendations for operators.
 """
 
 from __future__ import annotations
 
+import time
 from typing import TypedDict
 
 from utils.logging import setup_logger
@@ -19,12 +22,20 @@ CONSIDER_RETRAINING_MODEL = "Consider retraining the model with recent data."
 DRIFT_THRESHOLD = 0.5
 FAILED_RATE_THRESHOLD = 0.02
 LATENCY_MS_THRESHOLD = 500.0
+WARNING_INTERVAL_SECONDS = 300.0
 
 logger = setup_logger(__name__)
 
+# Monotonic time of the last warning emitted for each health condition.
+_last_warnings: dict[str, float] = {}
+
 
 class RetrainingMetrics(TypedDict):
-    """Operational metrics used to decide whether retraining is warranted."""
+    """Operational metrics used to decide whether retraining is warranted.
+
+    ``p95_latency_ms`` can be read from a ``utils.stats.QuantileSketch`` fed
+    with each observed latency, rather than by sorting a window of latencies.
+    """
 
     drift_score: float  # Aggregated drift signal (higher means more drift).
     failed_inference_rate: float  # Fraction of failed inferences in the window.
@@ -50,10 +61,12 @@ def should_retrain(metrics: RetrainingMetrics) -> bool:
     failed_rate = metrics.get("failed_inference_rate", 0.0)
     p95_latency_ms = metrics.get("p95_latency_ms", 0.0)
 
+    # Bitwise ``|`` on the comparison results evaluates all three without the
+    # short-circuit jumps of ``or``.
     return (
-        drift_score >= DRIFT_THRESHOLD
-        or failed_rate >= FAILED_RATE_THRESHOLD
-        or p95_latency_ms >= LATENCY_MS_THRESHOLD
+        (drift_score >= DRIFT_THRESHOLD)
+        | (failed_rate >= FAILED_RATE_THRESHOLD)
+        | (p95_latency_ms >= LATENCY_MS_THRESHOLD)
     )
 
 
@@ -66,44 +79,54 @@ def check_model_health(
     if drift_threshold <= 0:
         raise ValueError("drift_threshold must be positive")
 
-    training_mean = model.get("training_mean")
-    training_std = model.get("training_std")
-    live_mean = monitoring["mean_intensity"]["mean"]
-    live_std = monitoring["mean_intensity"]["std"]
-
-    recommendations: list[str] = []
-    drift_detected = False
     mean_delta = monitoring["drift"]["mean_intensity_delta"]
     std_delta = monitoring["drift"]["std_intensity_delta"]
+    # Both statistics are checked alike: (name, training, live, drift delta).
+    checks = (
+        (
+            "mean",
+            model["threshold"],
+            monitoring["mean_intensity"]["mean"],
+            mean_delta,
+        ),
+        (
+            "std",
+            model.get("training_std"),
+            monitoring["mean_intensity"]["std"],
+            std_delta,
+        ),
+    )
 
-    if training_mean is None:
-        logger.warning("Training mean missing; cannot evaluate mean intensity drift.")
-    elif mean_delta is not None and abs(mean_delta) > drift_threshold:
-        drift_detected = True
-        logger.warning(
-            "Potential data drift detected | metric=mean_intensity | "
-            "live=%.4f | training=%.4f | delta=%.4f | threshold=%.4f",
-            live_mean,
-            float(training_mean),
+    drift_detected = False
+    for statistic, training_value, live_value, delta in checks:
+        if training_value is None:
+            _warn_rate_limited(
+                f"training_{statistic}_missing",
+                "Training %s missing; cannot evaluate %s intensity drift.",
+                statistic,
+                statistic,
+            )
+        elif delta is not None and abs(delta) > drift_threshold:
+            drift_detected = True
+            _warn_rate_limited(
+                f"{statistic}_intensity_drift",
+                "Potential data drift detected | metric=%s_intensity | "
+                "live=%.4f | training=%.4f | delta=%.4f | threshold=%.4f",
+                statistic,
+                live_value,
+                float(training_value),
+                delta,
+                drift_threshold,
+            )
+
+    recommendations = [CONSIDER_RETRAINING_MODEL] if drift_detected else []
+
+    if not drift_detected:
+        logger.debug(
+            "No data drift detected | mean_delta=%s | std_delta=%s",
             mean_delta,
-            drift_threshold,
-        )
-        recommendations.append(CONSIDER_RETRAINING_MODEL)
-
-    if training_std is None:
-        logger.warning("Training std missing; cannot evaluate std intensity drift.")
-    elif std_delta is not None and abs(std_delta) > drift_threshold:
-        drift_detected = True
-        logger.warning(
-            "Potential data drift detected | metric=std_intensity | "
-            "live=%.4f | training=%.4f | delta=%.4f | threshold=%.4f",
-            live_std,
-            float(training_std),
             std_delta,
-            drift_threshold,
         )
-        if CONSIDER_RETRAINING_MODEL not in recommendations:
-            recommendations.append(CONSIDER_RETRAINING_MODEL)
 
     return {
         "drift_detected": drift_detected,
@@ -111,3 +134,15 @@ def check_model_health(
         "std_intensity_delta": std_delta,
         "recommendations": recommendations,
     }
+
+
+def _warn_rate_limited(condition: str, message: str, *args: object) -> None:
+    """Log a warning, or a debug message if ``condition`` warned too recently."""
+    now = time.monotonic()
+    last_warning = _last_warnings.get(condition)
+    if last_warning is not None and now - last_warning < WARNING_INTERVAL_SECONDS:
+        logger.debug(message, *args)
+        return
+
+    _last_warnings[condition] = now
+    logger.warning(message, *args)
@@ -4,16 +4,21 @@ Inference module for per-tile classification.
 Key design decisions:
 - Keep inference stateless and lightweight.
 - Load model artifacts explicitly to support batch and API workflows.
+- Parse each version of a model artifact once per process; forked worker
+  processes inherit the parsed artifact instead of re-reading it.
 """
 
 from __future__ import annotations
 
-import json
+import os
+from collections.abc import Callable, Iterable
+from functools import lru_cache
 from typing import TypedDict
 
 import numpy as np
+import orjson
 
-from model.features import extract_features
+from model.features import extract_features, extract_mean_intensities
 from utils.types_ import Model
 
 
@@ -24,10 +29,29 @@ class Predictions(TypedDict):
     mean_intensity: float
 
 
+class BatchPredictions(TypedDict):
+    """Format of batched predictions, with one entry per tile."""
+
+    predictions: np.ndarray
+    mean_intensities: np.ndarray
+
+
 def load_model(path: str) -> Model:
-    """Load a serialized model artifact from disk."""
-    with open(path) as f:
-        return json.load(f)
+    """Load a serialized model artifact from disk.
+
+    Artifacts are cached by path, modification time, and size, so a rewritten
+    artifact is parsed again while repeated loads of the same one only cost a
+    ``stat``. Callers receive their own copy of the cached model.
+    """
+    stat = os.stat(path)
+    return _load_model_version(path, stat.st_mtime_ns, stat.st_size).copy()
+
+
+@lru_cache(maxsize=8)
+def _load_model_version(path: str, mtime_ns: int, size: int) -> Model:
+    """Parse one version of a model artifact, identified by its stat key."""
+    with open(path, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def predict(tile: np.ndarray, model: Model) -> Predictions:
@@ -41,3 +65,64 @@ def predict(tile: np.ndarray, model: Model) -> Predictions:
         "prediction": prediction,
         "mean_intensity": features["mean_intensity"],
     }
+
+
+def make_predictor(model: Model) -> Callable[[np.ndarray], Predictions]:
+    """Return a per-tile ``predict`` specialized for one model.
+
+    The threshold is read once and bound in the returned closure, so long-lived
+    callers skip the model lookup on every tile.
+    """
+    threshold = float(model["threshold"])
+
+    def predict_tile(tile: np.ndarray) -> Predictions:
+        mean_intensity = extract_features(tile)["mean_intensity"]
+        return {
+            "prediction": int(mean_intensity > threshold),
+            "mean_intensity": mean_intensity,
+        }
+
+    return predict_tile
+
+
+def allocate_batch_predictions(batch_size: int) -> BatchPredictions:
+    """Allocate output arrays that ``predict_batch`` can fill for up to N tiles."""
+    return {
+        "predictions": np.empty(batch_size, dtype=np.int64),
+        "mean_intensities": np.empty(batch_size, dtype=np.float64),
+    }
+
+
+def predict_batch(
+    tiles: np.ndarray | Iterable[np.ndarray],
+    model: Model,
+    out: BatchPredictions | None = None,
+) -> BatchPredictions:
+    """Run vectorized inference on a stack of tiles.
+
+    The first axis of ``tiles`` indexes tiles; an iterable of same-layout tiles
+    is stacked into one array first. Each tile is flattened so that a
+    single SIMD-friendly reduction over one contiguous axis computes the mean
+    intensity of every tile. It is the reduction of ``extract_features``, so
+    batched and per-tile predictions are identical.
+
+    Both the reduction and the threshold comparison write straight into the
+    output arrays. Pass ``out`` (see ``allocate_batch_predictions``) to reuse them
+    across calls; the returned arrays are then views of its first rows.
+    """
+    if not isinstance(tiles, np.ndarray):
+        tiles = np.stack(list(tiles))
+
+    count = len(tiles)
+    if out is None:
+        out = allocate_batch_predictions(count)
+
+    mean_intensities = out["mean_intensities"][:count]
+    predictions = out["predictions"][:count]
+    extract_mean_intensities(tiles, out=mean_intensities)
+    np.greater(mean_intensities, model["threshold"], out=predictions)
+
+    return {
+        "predictions": predictions,
+        "mean_intensities": mean_intensities,
+    }
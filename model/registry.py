@@ -1,11 +1,38 @@
 """Model registry utilities."""
 
+import os
 from pathlib import Path
 
+# Latest artifact of each model directory, keyed by the directory's mtime.
+_latest_models: dict[Path, tuple[int, Path]] = {}
+
 
 def get_latest_model(model_directory: Path) -> Path:
-    """Return the most recently created model artifact."""
-    models = list(model_directory.glob("model_*.json"))
-    if not models:
+    """Return the most recently created model artifact.
+
+    Adding or removing an artifact updates the directory's modification time,
+    so the result is cached until it changes and repeated lookups only cost one
+    ``stat`` of the directory.
+    """
+    directory_mtime_ns = model_directory.stat().st_mtime_ns
+    cached = _latest_models.get(model_directory)
+    if cached is not None and cached[0] == directory_mtime_ns:
+        return cached[1]
+
+    with os.scandir(model_directory) as entries:
+        latest = max(
+            (
+                entry
+                for entry in entries
+                if entry.name.startswith("model_") and entry.name.endswith(".json")
+            ),
+            key=lambda entry: entry.stat().st_ctime_ns,
+            default=None,
+        )
+
+    if latest is None:
         raise FileNotFoundError("No model artifacts found")
-    return max(models, key=lambda model_path: model_path.stat().st_ctime)
+
+    latest_path = model_directory / latest.name
+    _latest_models[model_directory] = (directory_mtime_ns, latest_path)
+    return latest_path
@@ -4,45 +4,50 @@ Training module for a simple per-tile classifier.
 Key design decisions:
 - Use a trivial model to demonstrate training, serialization, and versioning.
 - Avoid heavy ML frameworks to keep focus on production workflows.
+- Write artifacts atomically, so a model is either complete or absent.
 """
 
-import json
+import os
 import uuid
 from pathlib import Path
 
-import numpy as np
+import orjson
 
-from model.features import Features
+from utils.stats import MeanStdSketch
 from utils.types_ import Model
 
 
-def train_model(aggregated_features: list[Features]) -> Model:
-    """Train a simple threshold-based model from aggregated features."""
-    if not aggregated_features:
+def train_model(mean_intensities: MeanStdSketch) -> Model:
+    """Train a simple threshold-based model from the mean intensities of tiles.
+
+    The threshold is the mean of the tiles' mean intensities, read from a
+    running sketch so no per-tile features need to be kept. It doubles as the
+    training mean that drift is measured against.
+    """
+    if mean_intensities.count == 0:
         raise ValueError(
-            "Cannot train model: 'aggregated_features' must contain at least one "
-            "feature set."
+            "Cannot train model: 'mean_intensities' must summarize at least one tile."
         )
 
-    means = [features["mean_intensity"] for features in aggregated_features]
-    threshold = float(np.mean(means))
-    training_std = float(np.std(means))
-
     return {
-        "threshold": threshold,
-        "training_mean": threshold,
-        "training_std": training_std,
+        "threshold": mean_intensities.mean,
+        "training_std": mean_intensities.std,
     }
 
 
 def save_model(model: Model, output_dir: Path) -> Path:
-    """Serialize a trained model artifact to disk with a unique version."""
+    """Serialize a trained model artifact to disk with a unique version.
+
+    The artifact is written as compact JSON to a temporary file that is then
+    renamed into place, so the registry never picks up a partial artifact.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
 
     model_id = str(uuid.uuid4())
     model_path = output_dir / f"model_{model_id}.json"
+    temporary_path = model_path.with_name(model_path.name + ".tmp")
 
-    with open(model_path, "w") as f:
-        json.dump(model, f, indent=2)
+    temporary_path.write_bytes(orjson.dumps(model, option=orjson.OPT_APPEND_NEWLINE))
+    os.replace(temporary_path, model_path)
 
     return model_path
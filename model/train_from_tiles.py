@@ -4,49 +4,151 @@ Training script for a simple per-tile classification model.
 Key design decisions:
 - Train a trivial, interpretable model to focus on pipeline mechanics.
 - Derive model parameters from real tile data.
+- Read tiles in place into one reusable buffer and reduce them to their mean
+  intensities in batches to amortize per-tile overhead, without computing the
+  other features. The buffer is sized from the first tile; a tile whose shape
+  or dtype does not fit it is read and sketched on its own rather than failing
+  training.
+- Summarize mean intensities with a running sketch in a single pass, so memory does not
+  grow with the number of tiles.
+- Sketch batches independently so they can be read in worker processes, then
+  merge their sketches; the merge is exact up to floating-point rounding.
 - Produce an immutable, versioned model artifact.
 """
 
 from __future__ import annotations
 
+import os
 import shutil
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
 from pathlib import Path
 
-from model.features import Features, extract_features
+import numpy as np
+
+from core_pipeline.exceptions import TileLayoutError
+from model.features import extract_mean_intensities
 from model.train import save_model, train_model
-from utils.data import load_tile
+from utils.data import list_tiles, load_tile, read_tile_layout, tile_array_dtype
+from utils.stats import MeanStdSketch
+
+# Per-process batch buffer of training worker processes, set by _init_worker.
+_worker_buffer: np.ndarray | None = None
+
+
+def aggregate_mean_intensities(
+    tile_paths: list[Path], batch_size: int = 32, num_workers: int = 1
+) -> MeanStdSketch:
+    """Return a running sketch of the mean intensities of multiple tiles.
+
+    Tiles are read in place into one reusable buffer sized from the first tile,
+    and their means are reduced ``batch_size`` tiles at a time. Each
+    batch is summarized by its own sketch and the sketches are merged, so memory
+    does not grow with the number of tiles. With ``num_workers`` greater than
+    one, batches are summarized across that many worker processes.
+    """
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+    if num_workers <= 0:
+        raise ValueError("num_workers must be a positive integer")
+    if not tile_paths:
+        return MeanStdSketch()
+
+    tile_shape, tile_dtype = read_tile_layout(tile_paths[0])
+    buffer_dtype = tile_array_dtype(tile_dtype)
+    batch_size = min(batch_size, len(tile_paths))
+    batches = [
+        tile_paths[start : start + batch_size]
+        for start in range(0, len(tile_paths), batch_size)
+    ]
+
+    if num_workers == 1:
+        buffer = np.empty((batch_size, *tile_shape), dtype=buffer_dtype)
+        return _merge_sketches(_sketch_batch(batch, buffer) for batch in batches)
+
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_worker,
+        initargs=(tile_shape, buffer_dtype, batch_size),
+    ) as pool:
+        return _merge_sketches(pool.map(_sketch_batch_in_worker, batches))
+
+
+def _merge_sketches(sketches: Iterable[MeanStdSketch]) -> MeanStdSketch:
+    """Merge the sketches of disjoint batches into one."""
+    return reduce(MeanStdSketch.merge, sketches, MeanStdSketch())
+
+
+def _sketch_batch(batch_paths: list[Path], buffer: np.ndarray) -> MeanStdSketch:
+    """Read a batch of tiles into ``buffer`` and sketch their mean intensities.
+
+    Tiles that do not fit ``buffer`` are read on their own and added to the
+    sketch of the tiles that do.
+    """
+    rows = 0
+    separate_tiles = []
+    for tile_path in batch_paths:
+        try:
+            load_tile(tile_path, out=buffer[rows])
+            rows += 1
+        except TileLayoutError:
+            separate_tiles.append(load_tile(tile_path))
+
+    sketch = MeanStdSketch()
+    if rows:
+        sketch = MeanStdSketch.from_values(extract_mean_intensities(buffer[:rows]))
+    for tile in separate_tiles:
+        sketch = sketch.add(float(extract_mean_intensities(tile[np.newaxis])[0]))
+
+    return sketch
+
+
+def _init_worker(
+    tile_shape: tuple[int, int, int], buffer_dtype: np.dtype, batch_size: int
+) -> None:
+    """Allocate the batch buffer once per worker process."""
+    global _worker_buffer
+
+    _worker_buffer = np.empty((batch_size, *tile_shape), dtype=buffer_dtype)
 
 
-def collect_tile_features(tile_paths: list[Path]) -> list[Features]:
-    """Collect features across multiple tiles."""
-    collected_features = []
+def _sketch_batch_in_worker(batch_paths: list[Path]) -> MeanStdSketch:
+    """Sketch one batch of tiles in a worker process."""
+    if _worker_buffer is None:
+        raise RuntimeError("Training worker was not initialized.")
 
-    for tile_path in tile_paths:
-        tile = load_tile(tile_path)
-        features = extract_features(tile)
-        collected_features.append(features)
+    return _sketch_batch(batch_paths, _worker_buffer)
 
-    return collected_features
 
+def update_latest_model(model_path: Path, latest_path: Path) -> None:
+    """Point the path representing the latest model at a model artifact.
 
-def copy_model_to_latest(model_path: Path, latest_path: Path) -> None:
-    """Copy the model artifact to the path representing the latest model."""
-    shutil.copyfile(model_path, latest_path)
+    The artifact is copied next to ``latest_path`` and swapped into place
+    atomically, so readers of ``latest_path`` never see a partially written
+    model. It is copied rather than hard-linked: linking would update the
+    artifact's ctime, which ``get_latest_model`` orders artifacts by.
+    """
+    temporary_path = latest_path.with_name(latest_path.name + ".tmp")
+    shutil.copyfile(model_path, temporary_path)
+    os.replace(temporary_path, latest_path)
 
 
 if __name__ == "__main__":
     from constants import MODELS_DIRECTORY, TILES_DIRECTORY
 
-    tile_paths = sorted(TILES_DIRECTORY.glob("*.tif"))
+    tile_paths = list_tiles(TILES_DIRECTORY)
     if not tile_paths:
         raise ValueError(f"No .tif tiles found in {TILES_DIRECTORY} for training")
 
-    features = collect_tile_features(tile_paths)
-    model = train_model(features)
+    mean_intensities = aggregate_mean_intensities(
+        tile_paths, num_workers=os.cpu_count() or 1
+    )
+    model = train_model(mean_intensities)
     model_path = save_model(model, MODELS_DIRECTORY)
 
     latest_model_path = MODELS_DIRECTORY / "latest_model.json"
-    copy_model_to_latest(model_path, latest_model_path)
+    update_latest_model(model_path, latest_model_path)
 
     print(f"Model trained and saved at {model_path}")
     print(f"Latest model updated at {latest_model_path}")
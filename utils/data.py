@@ -1,10 +1,84 @@
+import os
 from pathlib import Path
 
 import numpy as np
 import rasterio
+from numpy.typing import DTypeLike
 
+from constants import TILE_STACK_FILE
+from core_pipeline.exceptions import TileLayoutError
 
-def load_tile(path: Path) -> np.ndarray:
-    """Load a raster tile from disk as a NumPy array."""
+
+def load_tile(path: Path, out: np.ndarray | None = None) -> np.ndarray:
+    """Load a raster tile from disk as a NumPy array.
+
+    Without ``out``, the tile is returned in the ``tile_array_dtype`` of its
+    raster dtype, so float64 rasters take half the memory.
+
+    When ``out`` is given, the tile is read directly into it, so callers can reuse
+    one allocation across many tiles. Its shape must match the tile's
+    ``(bands, height, width)``. rasterio casts to the dtype of ``out``, which must
+    hold the tile's values without loss unless it is float32.
+
+    :raises TileLayoutError: If the tile does not fit the shape or dtype of ``out``.
+    """
     with rasterio.open(path) as source:
-        return source.read()
+        if out is None:
+            return source.read(out_dtype=tile_array_dtype(source.dtypes[0]))
+
+        shape = (source.count, source.height, source.width)
+        if out.shape != shape:
+            raise TileLayoutError(
+                f"Unexpected tile shape {shape}, expected {out.shape}"
+            )
+
+        dtype = np.dtype(source.dtypes[0])
+        if out.dtype != np.float32 and not np.can_cast(dtype, out.dtype):
+            raise TileLayoutError(f"Cannot read {dtype} tile into a {out.dtype} buffer")
+
+        return source.read(out=out)
+
+
+def load_tile_stack(directory: Path) -> np.ndarray:
+    """Memory-map the tile stack written by ``generate_tile_stack`` read-only.
+
+    Tiles are only read from disk when accessed, one contiguous block per tile.
+    """
+    return np.load(directory / TILE_STACK_FILE, mmap_mode="r")
+
+
+def tile_array_dtype(dtype: DTypeLike) -> np.dtype:
+    """Return the dtype that tiles of a given raster dtype are held in.
+
+    8- and 16-bit integers are kept as is, since feature reductions sum them
+    exactly in int64. Floating-point rasters are held as float32 to bound the
+    memory of float64 rasters; reductions still accumulate in float64.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.kind in "iu" and dtype.itemsize <= 2:
+        return dtype
+
+    return np.dtype(np.float32)
+
+
+def read_tile_layout(path: Path) -> tuple[tuple[int, int, int], np.dtype]:
+    """Return the ``(bands, height, width)`` shape and the dtype of a raster tile."""
+    with rasterio.open(path) as source:
+        shape = (source.count, source.height, source.width)
+        return shape, np.dtype(source.dtypes[0])
+
+
+def list_tiles(directory: Path) -> list[Path]:
+    """Return the GeoTIFF tiles of a directory, sorted by file name.
+
+    A single ``os.scandir`` pass reuses the file type reported by the directory
+    listing, so no extra ``stat`` call is made per entry.
+    """
+    with os.scandir(directory) as entries:
+        names = sorted(
+            entry.name
+            for entry in entries
+            if entry.name.endswith(".tif") and entry.is_file()
+        )
+
+    return [directory / name for name in names]
@@ -1,20 +1,26 @@
 """Shared utilities for logging."""
 
 import logging
+from functools import cache
 
+# One handler and formatter are shared by every logger of the project.
+_HANDLER = logging.StreamHandler()
+_HANDLER.setFormatter(
+    logging.Formatter("%(asctime)s | %(levelname)s | %(name)s | %(message)s")
+)
 
+
+@cache
 def setup_logger(name: str) -> logging.Logger:
-    """Configure and return a module-level logger."""
+    """Configure and return a module-level logger.
+
+    Loggers are configured once per name; later calls return the same logger.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
 
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+    if _HANDLER not in logger.handlers:
+        logger.addHandler(_HANDLER)
 
     logger.propagate = False  # Prevent duplicate log messages due to propagation.
     return logger
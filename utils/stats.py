@@ -0,0 +1,135 @@
+"""Shared utilities for streaming statistics."""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import NamedTuple
+
+import numpy as np
+
+
+class MeanStdSketch(NamedTuple):
+    """Running count, mean, and sum of squared deviations of a series of values.
+
+    Updates follow Welford's algorithm and merges follow Chan et al.'s parallel
+    formula, so the standard deviation stays accurate when the spread is small
+    relative to the mean. Sketches are immutable: ``add`` and ``merge`` return
+    a new sketch.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    sum_squared_deviations: float = 0.0
+
+    @classmethod
+    def from_values(cls, values: np.ndarray) -> MeanStdSketch:
+        """Return the sketch of an array of values, computed in vectorized passes."""
+        values = values.ravel()
+        if values.size == 0:
+            return cls()
+
+        mean = float(values.mean(dtype=np.float64))
+        deviations = values - mean
+        return cls(values.size, mean, float(np.dot(deviations, deviations)))
+
+    @property
+    def std(self) -> float:
+        """Return the population standard deviation of the values."""
+        if self.count == 0:
+            return 0.0
+        return math.sqrt(self.sum_squared_deviations / self.count)
+
+    def add(self, value: float) -> MeanStdSketch:
+        """Return the sketch updated with one more value."""
+        count = self.count + 1
+        delta = value - self.mean
+        mean = self.mean + delta / count
+        return MeanStdSketch(
+            count, mean, self.sum_squared_deviations + delta * (value - mean)
+        )
+
+    def merge(self, other: MeanStdSketch) -> MeanStdSketch:
+        """Return the sketch of the values of both sketches."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return MeanStdSketch(
+            count,
+            self.mean + delta * other.count / count,
+            self.sum_squared_deviations
+            + other.sum_squared_deviations
+            + delta * delta * self.count * other.count / count,
+        )
+
+
+class QuantileSketch:
+    """Approximate quantiles of a stream of non-negative values, such as latencies.
+
+    Values are counted in logarithmic buckets, so every quantile is returned
+    within ``relative_accuracy`` of a value of the stream, whatever the
+    distribution. Memory grows with the logarithm of the range of the values
+    rather than with their number, and sketches with the same accuracy merge
+    exactly by adding bucket counts. Unlike ``MeanStdSketch``, sketches are
+    updated in place.
+    """
+
+    __slots__ = ("count", "relative_accuracy", "_buckets", "_log_gamma", "_zeros")
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        """Initialize an empty sketch."""
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.count = 0
+        self.relative_accuracy = relative_accuracy
+        self._buckets: defaultdict[int, int] = defaultdict(int)
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._zeros = 0
+
+    def add(self, value: float) -> None:
+        """Count one more value."""
+        if value < 0:
+            raise ValueError("QuantileSketch values must not be negative")
+
+        self.count += 1
+        if value == 0:
+            self._zeros += 1
+        else:
+            self._buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    def merge(self, other: QuantileSketch) -> None:
+        """Count the values of another sketch with the same accuracy."""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different accuracies")
+
+        self.count += other.count
+        self._zeros += other._zeros
+        for key, count in other._buckets.items():
+            self._buckets[key] += count
+
+    def quantile(self, q: float) -> float:
+        """Return the approximate ``q``-quantile of the values, or 0 when empty."""
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return 0.0
+
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if seen > rank:
+            return 0.0
+
+        gamma = math.exp(self._log_gamma)
+        for key in sorted(self._buckets):
+            seen += self._buckets[key]
+            if seen > rank:
+                # Bucket ``key`` spans (gamma**(key - 1), gamma**key]; this value
+                # is within ``relative_accuracy`` of both bounds.
+                return 2 * gamma**key / (1 + gamma)
+
+        raise AssertionError("Bucket counts do not add up to the sketch count")
@@ -34,8 +34,10 @@ class MonitoringMetrics(TypedDict):
 
 
 class Model(TypedDict):
-    """A trained model."""
+    """A trained model.
+
+    The threshold is the training mean of the tiles' mean intensities.
+    """
 
     threshold: float
-    training_mean: float | None
     training_std: float | None